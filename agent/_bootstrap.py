@@ -0,0 +1,18 @@
+# agent/_bootstrap.py
+
+"""
+One-time process bootstrap: loads .env and checks the API key.
+
+Importing this module anywhere guarantees the work runs exactly once per
+process; Python's import cache makes every later import free.
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Check for Google API Key
+if not os.getenv("GOOGLE_API_KEY"):
+    raise ValueError("GOOGLE_API_KEY not found in environment variables.")
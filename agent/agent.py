@@ -1,30 +1,114 @@
-import os
-from dotenv import load_dotenv
+import asyncio
+
+import agent._bootstrap  # noqa: F401  (loads .env and checks the API key once)
 from google.adk.agents import Agent
-from google.adk.tools.function_tool import FunctionTool
+from google.adk.models import Gemini
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
 
-# Import the CRUD tools
-from agent.tools.tools import (
-    create_user,
-    read_user,
-    update_user,
-    delete_user,
-    list_users,
-    delete_all_users,
-    populate_database
-)
+# Import the shared CRUD toolset (wrapped in FunctionTool once, at import)
+from agent.tools import CRUD_TOOLS
+from agent.tools.tools import populate_database
+from agent.semantic_cache import SemanticCache, CACHEABLE_TOOLS
+from agent.plan_cache import PlanCache
+
+# --- Semantic cache around the tool-selection model call ---
+# Rephrasings of the same request ("list users" / "show all users") would
+# otherwise each pay a Gemini round-trip just to pick the same tool. The
+# before-model callback answers from the cache when a similar prompt was
+# seen before; the after-model callback stores new argument-free tool picks.
+_tool_cache = SemanticCache()
+
+# --- Agentic plan cache for multi-step workflows ---
+# Once the model has planned a multi-step request (e.g. update = read then
+# write), the tool-call sequence is stored as a template keyed on the
+# prompt's keywords. A later prompt with the same keywords replays the
+# recorded steps with its own entities filled in, skipping plan generation;
+# only the final summarization turn still reaches Gemini.
+_plan_cache = PlanCache()
+
+# Per-invocation bookkeeping: the prompt that started the run, cached plan
+# steps still to be served, and the tool calls executed so far. An entry is
+# popped when its run ends in a text turn, but a run that errors out or is
+# cancelled never reaches one, so the dict is also capped - the oldest
+# entries (insertion order) are evicted once it grows past the bound.
+_MAX_TRACKED_INVOCATIONS = 64
+_invocations = {}
+
+def _last_user_text(llm_request):
+    """Extracts the text of the most recent user message in the request."""
+    for content in reversed(llm_request.contents or []):
+        if content.role == "user":
+            texts = [part.text for part in content.parts or [] if part.text]
+            if texts:
+                return " ".join(texts)
+    return None
+
+def _function_call_response(tool_name, args):
+    """Builds the LlmResponse the model would have produced for a tool call."""
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name=tool_name, args=args))
+    ]))
+
+def _check_tool_cache(callback_context, llm_request):
+    """Returns a cached LlmResponse to skip the Gemini call on a hit."""
+    state = _invocations.setdefault(
+        callback_context.invocation_id, {"prompt": None, "plan": None, "steps": []}
+    )
+    while len(_invocations) > _MAX_TRACKED_INVOCATIONS:
+        _invocations.pop(next(iter(_invocations)))
+    if state["prompt"] is None:
+        state["prompt"] = _last_user_text(llm_request)
+        if state["prompt"]:
+            cached = _tool_cache.get(state["prompt"])
+            if cached is not None:
+                return cached
+            state["plan"] = _plan_cache.lookup(state["prompt"])
+    if state["plan"]:
+        tool_name, args = state["plan"].pop(0)
+        return _function_call_response(tool_name, args)
+    return None
+
+def _record_tool_call(tool, args, tool_context, tool_response):
+    """Collects executed tool calls so the finished plan can be cached."""
+    state = _invocations.get(tool_context.invocation_id)
+    if state is not None:
+        state["steps"].append((tool.name, dict(args)))
+    return None
 
-# Load environment variables from .env file
-load_dotenv()
+def _store_tool_selection(callback_context, llm_response):
+    """Caches read-only tool selections and completed plans for reuse."""
+    state = _invocations.get(callback_context.invocation_id)
+    if state is None or not state["prompt"]:
+        return None
+    content = getattr(llm_response, "content", None)
+    parts = content.parts if content and content.parts else []
+    tool_calls = [part.function_call for part in parts if part.function_call]
+    if tool_calls:
+        # Only cache argument-free selections: replaying a call that carries
+        # arguments - even a read's user_id - could serve a different
+        # prompt's values on a near-match hit.
+        if all(call.name in CACHEABLE_TOOLS and not call.args for call in tool_calls):
+            _tool_cache.put(state["prompt"], llm_response)
+    else:
+        # A text turn ends the run: store the executed tool sequence as a
+        # plan template (PlanCache refuses any plan whose arguments did not
+        # come from the prompt itself) and drop the bookkeeping.
+        _plan_cache.record(state["prompt"], state["steps"])
+        _invocations.pop(callback_context.invocation_id, None)
+    return None
 
-# Check for Google API Key
-if not os.getenv("GOOGLE_API_KEY"):
-    raise ValueError("GOOGLE_API_KEY not found in environment variables.")
+# One shared Gemini model instance for the whole process. Its API client
+# (and the keep-alive HTTP connection pool behind it) is created lazily and
+# cached on the instance, so every model call reuses established TLS
+# connections instead of paying a fresh handshake. Any additional agent
+# should pass this same instance rather than a model-name string.
+GEMINI_MODEL = Gemini(model="gemini-2.0-flash")
 
 # Define the agent
 db_agent = Agent(
     name="db_agent",
-    model="gemini-2.0-flash",
+    model=GEMINI_MODEL,
     instruction="""
     You are a database management assistant.
     You can perform CRUD operations (Create, Read, Update, Delete) on a user database.
@@ -33,6 +117,7 @@ db_agent = Agent(
     
     Available operations:
     - Create User: Add a new user with name and email
+    - Create User and List: Add a new user and show the full user list in one step (prefer this over separate create + list calls when asked to create a user and show all users)
     - Read User: Retrieve a specific user by their ID
     - Update User: Modify an existing user's name and email
     - Delete User: Remove a user from the database
@@ -40,17 +125,10 @@ db_agent = Agent(
     - Delete All Users: Remove all users from the database (WARNING: Cannot be undone)
     - Populate Database: Add sample users to an empty database
     """,
-    tools=[
-        FunctionTool(fn) for fn in [
-            create_user,
-            read_user,
-            update_user,
-            delete_user,
-            list_users,
-            delete_all_users,
-            populate_database
-        ]
-    ]
+    tools=list(CRUD_TOOLS),
+    before_model_callback=_check_tool_cache,
+    after_model_callback=_store_tool_selection,
+    after_tool_callback=_record_tool_call
 )
 
 # Required for ADK: expose the root agent
@@ -59,7 +137,8 @@ root_agent = db_agent
 # --- Populate the database with sample users if empty ---
 def _populate_db():
     """Initialize the database with sample users if it's empty."""
-    result = populate_database()
+    # Import time, so no event loop is running yet; drive the async tool here.
+    result = asyncio.run(populate_database())
     print(f"Database initialization: {result['message']}")
 
 _populate_db()
@@ -0,0 +1,125 @@
+# agent/plan_cache.py
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.tools.tools import _CONN, _READ_CONN, _WRITE_EXECUTOR
+
+# Entity slots that can be re-filled from a new prompt. A recorded plan only
+# stores placeholders for these, never the original values, so replaying it
+# always uses arguments taken from the prompt at hand.
+_ENTITY_PATTERNS = {
+    "email": re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"),
+    "user_id": re.compile(r"\b\d+\b"),
+    "name": re.compile(r"['\"]([^'\"]+)['\"]|\b([A-Z][a-z]+ [A-Z][a-z]+)\b"),
+}
+
+_STOPWORDS = frozenset(
+    "a an the to of for with and or in on me my please can you could".split()
+)
+
+
+def extract_entities(prompt: str) -> Dict[str, Any]:
+    """Pulls the argument-like values (id, email, name) out of a prompt."""
+    entities: Dict[str, Any] = {}
+    email = _ENTITY_PATTERNS["email"].search(prompt)
+    if email:
+        entities["email"] = email.group(0)
+    # Strip the email before looking for an id so "bob2@x.com" digits don't
+    # get mistaken for a user id.
+    remainder = _ENTITY_PATTERNS["email"].sub(" ", prompt)
+    user_id = _ENTITY_PATTERNS["user_id"].search(remainder)
+    if user_id:
+        entities["user_id"] = int(user_id.group(0))
+    name = _ENTITY_PATTERNS["name"].search(remainder)
+    if name:
+        entities["name"] = name.group(1) or name.group(2)
+    return entities
+
+
+def extract_keywords(prompt: str) -> str:
+    """Reduces a prompt to a stable keyword key, dropping entity values."""
+    scrubbed = prompt
+    for pattern in _ENTITY_PATTERNS.values():
+        scrubbed = pattern.sub(" ", scrubbed)
+    tokens = sorted(
+        set(re.findall(r"[a-z]+", scrubbed.lower())) - _STOPWORDS
+    )
+    return " ".join(tokens)
+
+
+class PlanCache:
+    """
+    Caches tool-call plans extracted from past agent runs.
+
+    A plan is the sequence of tool calls the model produced for a prompt,
+    with every argument replaced by an entity placeholder ($user_id, $email,
+    $name). New prompts are keyed by their keywords; on a match the
+    placeholders are re-filled from the new prompt's entities and the tools
+    can run without asking Gemini to plan again. Plans whose arguments did
+    not all come from the prompt are never stored, so a replay can never
+    reuse values the model invented for someone else's request.
+    """
+
+    def __init__(self):
+        # Construction happens at import, before any event loop runs, so it
+        # is safe to wait for the writer thread here.
+        _WRITE_EXECUTOR.submit(_CONN.execute, """
+            CREATE TABLE IF NOT EXISTS plan_cache (
+                keywords TEXT PRIMARY KEY,
+                steps TEXT NOT NULL
+            )
+        """).result()
+
+    def record(self, prompt: str, steps: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """Stores the plan for a prompt if it can be fully templated.
+
+        Returns True when the plan was cached, False when some argument
+        value could not be traced back to an entity in the prompt.
+        """
+        if not steps:
+            return False
+        entities = extract_entities(prompt)
+        template = []
+        for tool_name, args in steps:
+            template_args = {}
+            for key, value in (args or {}).items():
+                slot = next((s for s, v in entities.items() if v == value), None)
+                if slot is None:
+                    return False
+                template_args[key] = f"${slot}"
+            template.append({"tool": tool_name, "args": template_args})
+        # Advisory write: hand it to the writer thread without waiting, so
+        # the callback recording the plan never blocks the event loop.
+        _WRITE_EXECUTOR.submit(
+            _CONN.execute,
+            "INSERT OR REPLACE INTO plan_cache (keywords, steps) VALUES (?, ?)",
+            (extract_keywords(prompt), json.dumps(template))
+        )
+        return True
+
+    def lookup(self, prompt: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """Returns the plan for a prompt with arguments filled in, or None.
+
+        None is returned on a keyword miss and also when the new prompt is
+        missing an entity the plan needs - in that case the model should
+        plan normally rather than run a half-filled plan.
+        """
+        row = _READ_CONN.execute(
+            "SELECT steps FROM plan_cache WHERE keywords = ?",
+            (extract_keywords(prompt),)
+        ).fetchone()
+        if row is None:
+            return None
+        entities = extract_entities(prompt)
+        steps = []
+        for step in json.loads(row[0]):
+            args = {}
+            for key, placeholder in step["args"].items():
+                slot = placeholder[1:]
+                if slot not in entities:
+                    return None
+                args[key] = entities[slot]
+            steps.append((step["tool"], args))
+        return steps
@@ -0,0 +1,74 @@
+# agent/semantic_cache.py
+
+from typing import Any, List, Optional, Tuple
+
+# sentence-transformers is optional: when it's installed the cache matches
+# on real sentence embeddings; without it the cache stays inert. A token-
+# overlap fallback was tried and dropped - it scores genuine rephrasings
+# ("show all users" vs "list users") far below the embedding threshold, and
+# loosening the cutoff makes action words collide ("delete all users"
+# overlaps "list users"), replaying the wrong tool.
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+_MODEL_NAME = "all-MiniLM-L6-v2"
+_SIMILARITY_THRESHOLD = 0.92
+
+# Tools whose cached selection is safe to replay verbatim: they take no
+# arguments, so a near-match prompt cannot smuggle in values that belonged
+# to a different request. Any selection that carries arguments - including
+# reads like read_user, whose user_id comes from the prompt - is never
+# cached: "show me user 7" would clear the threshold against a cached
+# "show me user 5" and replay the wrong id.
+CACHEABLE_TOOLS = frozenset({"list_users", "populate_database"})
+
+
+class SemanticCache:
+    """
+    Caches the model's tool selection for semantically similar prompts.
+
+    Near-identical utterances ("list users" vs "show all users") otherwise
+    each pay a full Gemini round-trip just to pick the same tool. A lookup
+    embeds the prompt and returns the stored response of the closest past
+    prompt when its cosine similarity clears the threshold; the caller then
+    replays the cached tool call without contacting the model. When
+    sentence-transformers is not installed every lookup misses, so the
+    agent simply always asks the model.
+    """
+
+    def __init__(self, threshold: float = _SIMILARITY_THRESHOLD, maxsize: int = 256):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries: List[Tuple[Any, Any]] = []  # (embedding, response)
+        self._model = SentenceTransformer(_MODEL_NAME) if SentenceTransformer else None
+
+    def get(self, prompt: str) -> Optional[Any]:
+        """Returns the cached response for the closest past prompt, if any.
+
+        The cache is small (a few hundred entries at most), so a brute-force
+        scan is equivalent to a FAISS flat inner-product index here.
+        """
+        if self._model is None:
+            return None
+        query = self._model.encode(prompt, normalize_embeddings=True)
+        best_score, best_response = 0.0, None
+        for embedding, response in self._entries:
+            score = float(query @ embedding)
+            if score > best_score:
+                best_score, best_response = score, response
+        if best_score >= self.threshold:
+            return best_response
+        return None
+
+    def put(self, prompt: str, response: Any) -> None:
+        """Stores a prompt -> response pair, evicting the oldest when full."""
+        if self._model is None:
+            return
+        if len(self._entries) >= self.maxsize:
+            self._entries.pop(0)
+        self._entries.append((self._model.encode(prompt, normalize_embeddings=True), response))
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1 +1,27 @@
 # agent/tools/__init__.py
+
+from google.adk.tools.function_tool import FunctionTool
+
+from agent.tools.tools import (
+    create_user,
+    create_user_and_list,
+    read_user,
+    update_user,
+    delete_user,
+    list_users,
+    delete_all_users,
+    populate_database
+)
+
+# Wrap every CRUD function exactly once at import time; any agent that wants
+# the toolset shares these FunctionTool objects instead of re-wrapping.
+CRUD_TOOLS = tuple(FunctionTool(fn) for fn in (
+    create_user,
+    create_user_and_list,
+    read_user,
+    update_user,
+    delete_user,
+    list_users,
+    delete_all_users,
+    populate_database
+))